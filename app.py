@@ -1,6 +1,8 @@
 from flask import Flask, render_template, request, jsonify
 import database
 import datetime
+import decimal
+import sqlite3
 import hashlib
 import uuid # For generating unique IDs
 
@@ -13,6 +15,34 @@ database.init_db()
 def row_to_dict(row):
     return dict(row) if row else None
 
+# Helper function to convert Row objects to dictionaries for JSON, turning stored cents into dollars
+def money_row_to_dict(row):
+    data = row_to_dict(row)
+    if data:
+        for field in ('balance', 'amount'):
+            if field in data:
+                data[field] = database.from_cents(data[field])
+    return data
+
+# Helper function to read a de-duplicated list of IDs from a bulk request body
+def get_bulk_ids(data):
+    if not isinstance(data, dict):
+        return None
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, str) for i in ids):
+        return None
+    return list(dict.fromkeys(ids))
+
+# Helper function to fetch rows by ID in parameter-sized chunks, keyed by ID
+def fetch_rows_by_ids(cursor, columns, table_name, ids):
+    rows = {}
+    for chunk in database.chunked(ids):
+        placeholders = ', '.join('?' * len(chunk))
+        cursor.execute(f"SELECT {columns} FROM {table_name} WHERE id IN ({placeholders})", chunk)
+        for row in cursor.fetchall():
+            rows[row['id']] = row_to_dict(row)
+    return rows
+
 # --- API Endpoints ---
 
 @app.route('/')
@@ -36,19 +66,15 @@ def get_dashboard_metrics():
     cursor.execute("SELECT COUNT(*) FROM Transactions WHERE transaction_date LIKE ? || '%'", (today,))
     transactions_today = cursor.fetchone()[0]
 
-    cursor.execute("SELECT SUM(amount) FROM Transactions WHERE type LIKE '%Deposit%' AND status = 'Completed'")
-    total_deposits = cursor.fetchone()[0] or 0.0
-
-    cursor.execute("SELECT SUM(amount) FROM Transactions WHERE type LIKE '%Withdrawal%' AND status = 'Completed'")
-    total_withdrawals = cursor.fetchone()[0] or 0.0
+    totals = database.get_money_totals(conn)
 
     conn.close()
     return jsonify({
         'totalCustomers': total_customers,
         'totalAccounts': total_accounts,
         'transactionsToday': transactions_today,
-        'totalDeposits': total_deposits,
-        'totalWithdrawals': total_withdrawals
+        'totalDeposits': database.from_cents(totals['deposits']),
+        'totalWithdrawals': database.from_cents(totals['withdrawals'])
     })
 
 @app.route('/api/users', methods=['GET'])
@@ -96,6 +122,10 @@ def add_user():
 
     if not all([name, email, password, role]):
         return jsonify({'error': 'Missing required fields'}), 400
+    try:
+        initial_balance = database.to_cents(initial_balance or 0)
+    except (ValueError, decimal.InvalidOperation):
+        return jsonify({'error': 'Invalid initial balance'}), 400
 
     conn = database.get_db_connection()
     cursor = conn.cursor()
@@ -128,7 +158,7 @@ def add_user():
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (account_id, user_id, account_number, name, 'Savings', initial_balance, 'Active', now, now))
             conn.commit()
-            database.add_audit_log('Admin User (U005)', 'New Account Created', f'Account No: {account_number} for User ID: {user_id}, Initial Balance: ${initial_balance:.2f}')
+            database.add_audit_log('Admin User (U005)', 'New Account Created', f'Account No: {account_number} for User ID: {user_id}, Initial Balance: ${database.format_money(initial_balance)}')
 
             if initial_balance > 0:
                 transaction_id = database.generate_unique_id('Transactions', 'T')
@@ -283,6 +313,100 @@ def toggle_user_status(user_id):
         conn.close()
         return jsonify({'error': f'Database error: {str(e)}'}), 500
 
+@app.route('/api/users/bulk_status', methods=['POST'])
+def bulk_toggle_user_status():
+    """Sets the active/inactive status of many users in a single transaction."""
+    data = request.get_json()
+    user_ids = get_bulk_ids(data)
+    if user_ids is None:
+        return jsonify({'error': 'A non-empty list of user IDs is required'}), 400
+    new_status = data.get('status')
+    if new_status not in ['Active', 'Inactive']:
+        return jsonify({'error': 'Invalid status provided'}), 400
+
+    conn = database.get_db_connection()
+    cursor = conn.cursor()
+    users = fetch_rows_by_ids(cursor, 'id, name, status', 'Users', user_ids)
+
+    results = []
+    to_update = []
+    for user_id in user_ids:
+        user = users.get(user_id)
+        if not user:
+            results.append({'id': user_id, 'outcome': 'not_found', 'message': 'User not found'})
+        elif user['status'] == new_status:
+            results.append({'id': user_id, 'outcome': 'unchanged', 'message': f'User is already {new_status}.'})
+        else:
+            to_update.append(user_id)
+            results.append({'id': user_id, 'outcome': 'updated', 'message': f'User {user_id} status changed to {new_status}.'})
+
+    if not to_update:
+        conn.close()
+        return jsonify({'updated': 0, 'results': results}), 200
+
+    now = datetime.datetime.now().isoformat()
+    try:
+        for chunk in database.chunked(to_update):
+            placeholders = ', '.join('?' * len(chunk))
+            cursor.execute(f'UPDATE Users SET status = ?, updated_at = ? WHERE id IN ({placeholders})', [new_status, now, *chunk])
+        database.add_audit_log('Admin User (U005)', f'Bulk Users {new_status}d',
+                               f'{len(to_update)} user(s) status changed to {new_status}. User IDs: {", ".join(to_update)}', conn=conn)
+        conn.commit()
+        conn.close()
+        return jsonify({'updated': len(to_update), 'results': results}), 200
+    except sqlite3.Error as e:
+        conn.rollback()
+        conn.close()
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+
+@app.route('/api/users/bulk_delete', methods=['POST'])
+def bulk_delete_users():
+    """Deletes many users and their associated accounts and transactions in a single transaction."""
+    user_ids = get_bulk_ids(request.get_json())
+    if user_ids is None:
+        return jsonify({'error': 'A non-empty list of user IDs is required'}), 400
+
+    conn = database.get_db_connection()
+    cursor = conn.cursor()
+    users = fetch_rows_by_ids(cursor, 'id, name', 'Users', user_ids)
+
+    results = []
+    to_delete = []
+    for user_id in user_ids:
+        user = users.get(user_id)
+        if not user:
+            results.append({'id': user_id, 'outcome': 'not_found', 'message': 'User not found'})
+        else:
+            to_delete.append(user_id)
+            results.append({'id': user_id, 'outcome': 'deleted', 'message': f'User "{user["name"]}" and associated accounts/transactions deleted.'})
+
+    if not to_delete:
+        conn.close()
+        return jsonify({'deleted': 0, 'results': results}), 200
+
+    deleted_accounts = 0
+    deleted_transactions = 0
+    try:
+        # Foreign keys are not enabled on these connections, so ON DELETE CASCADE
+        # never fires; remove dependent transactions and accounts explicitly.
+        for chunk in database.chunked(to_delete):
+            placeholders = ', '.join('?' * len(chunk))
+            cursor.execute(f'DELETE FROM Transactions WHERE account_id IN (SELECT id FROM Accounts WHERE user_id IN ({placeholders}))', chunk)
+            deleted_transactions += cursor.rowcount
+            cursor.execute(f'DELETE FROM Accounts WHERE user_id IN ({placeholders})', chunk)
+            deleted_accounts += cursor.rowcount
+            cursor.execute(f'DELETE FROM Users WHERE id IN ({placeholders})', chunk)
+        database.add_audit_log('Admin User (U005)', 'Bulk Users Deleted',
+                               f'{len(to_delete)} user(s) deleted along with {deleted_accounts} account(s) and {deleted_transactions} transaction(s). '
+                               f'User IDs: {", ".join(to_delete)}', conn=conn)
+        conn.commit()
+        conn.close()
+        return jsonify({'deleted': len(to_delete), 'results': results}), 200
+    except sqlite3.Error as e:
+        conn.rollback()
+        conn.close()
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+
 @app.route('/api/accounts', methods=['GET'])
 def get_accounts():
     """Retrieves a list of bank accounts, with optional search filtering."""
@@ -300,7 +424,7 @@ def get_accounts():
     else:
         cursor.execute('SELECT id, user_id, account_number, customer_name, account_type, balance, status, created_at, updated_at FROM Accounts ORDER BY created_at DESC')
 
-    accounts = [row_to_dict(row) for row in cursor.fetchall()]
+    accounts = [money_row_to_dict(row) for row in cursor.fetchall()]
     conn.close()
     return jsonify(accounts)
 
@@ -310,7 +434,7 @@ def get_account(account_id):
     conn = database.get_db_connection()
     cursor = conn.cursor()
     cursor.execute('SELECT id, user_id, account_number, customer_name, account_type, balance, status FROM Accounts WHERE id = ?', (account_id,))
-    account = row_to_dict(cursor.fetchone())
+    account = money_row_to_dict(cursor.fetchone())
     conn.close()
     if account:
         return jsonify(account)
@@ -325,6 +449,10 @@ def adjust_account_balance(account_id):
 
     if amount is None or not isinstance(amount, (int, float)) or not reason:
         return jsonify({'error': 'Invalid amount or missing reason'}), 400
+    try:
+        amount = database.to_cents(amount)
+    except (ValueError, decimal.InvalidOperation):
+        return jsonify({'error': 'Invalid amount or missing reason'}), 400
 
     conn = database.get_db_connection()
     cursor = conn.cursor()
@@ -353,9 +481,9 @@ def adjust_account_balance(account_id):
         conn.commit()
 
         database.add_audit_log('Admin User (U005)', 'Account Balance Adjusted',
-                               f'Account: {account["account_number"]} (ID: {account_id}), Adjusted by: ${amount:.2f}, Old Balance: ${old_balance:.2f}, New Balance: ${new_balance:.2f}, Reason: {reason}')
+                               f'Account: {account["account_number"]} (ID: {account_id}), Adjusted by: ${database.format_money(amount)}, Old Balance: ${database.format_money(old_balance)}, New Balance: ${database.format_money(new_balance)}, Reason: {reason}')
         conn.close()
-        return jsonify({'message': f'Balance for Account {account["account_number"]} adjusted by ${amount:.2f}. New Balance: ${new_balance:.2f}.'}), 200
+        return jsonify({'message': f'Balance for Account {account["account_number"]} adjusted by ${database.format_money(amount)}. New Balance: ${database.format_money(new_balance)}.'}), 200
     except sqlite3.Error as e:
         conn.rollback()
         conn.close()
@@ -404,7 +532,7 @@ def get_transactions():
     query += " ORDER BY transaction_date DESC"
 
     cursor.execute(query, params)
-    transactions = [row_to_dict(row) for row in cursor.fetchall()]
+    transactions = [money_row_to_dict(row) for row in cursor.fetchall()]
     conn.close()
     return jsonify(transactions)
 
@@ -414,7 +542,7 @@ def get_transaction(transaction_id):
     conn = database.get_db_connection()
     cursor = conn.cursor()
     cursor.execute('SELECT id, account_id, account_number, customer_name, type, amount, transaction_date, status, description FROM Transactions WHERE id = ?', (transaction_id,))
-    transaction = row_to_dict(cursor.fetchone())
+    transaction = money_row_to_dict(cursor.fetchone())
     conn.close()
     if transaction:
         return jsonify(transaction)
@@ -486,9 +614,99 @@ def reverse_transaction(transaction_id):
         conn.commit()
 
         database.add_audit_log('Admin User (U005)', 'Transaction Reversed',
-                               f'Transaction ID: {transaction_id} (Account: {transaction["account_number"]}), Amount: ${reversal_amount:.2f}, Type: {transaction["type"]}, Account balance changed from ${old_balance:.2f} to ${new_balance:.2f}.')
+                               f'Transaction ID: {transaction_id} (Account: {transaction["account_number"]}), Amount: ${database.format_money(reversal_amount)}, Type: {transaction["type"]}, Account balance changed from ${database.format_money(old_balance)} to ${database.format_money(new_balance)}.')
+        conn.close()
+        return jsonify({'message': f'Transaction {transaction_id} successfully reversed. Account {transaction["account_number"]} balance updated to ${database.format_money(new_balance)}.'}), 200
+    except sqlite3.Error as e:
+        conn.rollback()
+        conn.close()
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+
+@app.route('/api/transactions/bulk_reverse', methods=['POST'])
+def bulk_reverse_transactions():
+    """Reverses many completed transactions in a single transaction."""
+    transaction_ids = get_bulk_ids(request.get_json())
+    if transaction_ids is None:
+        return jsonify({'error': 'A non-empty list of transaction IDs is required'}), 400
+
+    conn = database.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        # Take the write lock before reading, so a concurrent reversal cannot see the
+        # same transactions as "Completed" and reverse them a second time
+        cursor.execute('BEGIN IMMEDIATE')
+    except sqlite3.Error as e:
+        conn.close()
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+    transactions = fetch_rows_by_ids(cursor, 'id, account_id, account_number, customer_name, type, amount, transaction_date, status, description',
+                                     'Transactions', transaction_ids)
+    account_ids = list({txn['account_id'] for txn in transactions.values()})
+    accounts = fetch_rows_by_ids(cursor, 'id', 'Accounts', account_ids)
+
+    results = []
+    to_reverse = []
+    balance_changes = {}
+    for transaction_id in transaction_ids:
+        transaction = transactions.get(transaction_id)
+        if not transaction:
+            results.append({'id': transaction_id, 'outcome': 'not_found', 'message': 'Transaction not found'})
+            continue
+        if transaction['status'] != 'Completed':
+            results.append({'id': transaction_id, 'outcome': 'rejected', 'message': 'Only "Completed" transactions can be reversed.'})
+            continue
+        if 'Reversal' in transaction['type'] or 'Adjustment' in transaction['type']:
+            results.append({'id': transaction_id, 'outcome': 'rejected', 'message': 'Cannot reverse a reversal or adjustment transaction.'})
+            continue
+        if transaction['account_id'] not in accounts:
+            results.append({'id': transaction_id, 'outcome': 'not_found', 'message': 'Associated account not found.'})
+            continue
+
+        reversal_amount = transaction['amount']
+        if 'Deposit' in transaction['type']:
+            balance_change = -reversal_amount
+            reversal_type = 'Withdrawal (Reversal)'
+        elif 'Withdrawal' in transaction['type']:
+            balance_change = reversal_amount
+            reversal_type = 'Deposit (Reversal)'
+        elif 'Transfer' in transaction['type']:
+            # For simplicity, assuming this is the sending account and reversing the outflow
+            balance_change = reversal_amount
+            reversal_type = 'Deposit (Transfer Reversal)'
+        else:
+            results.append({'id': transaction_id, 'outcome': 'rejected', 'message': 'Cannot determine reversal type for this transaction.'})
+            continue
+
+        # Several transactions may share an account, so changes accumulate per account
+        # and are applied relative to the stored balance at write time
+        balance_changes[transaction['account_id']] = balance_changes.get(transaction['account_id'], 0) + balance_change
+        to_reverse.append((transaction, reversal_type))
+        results.append({'id': transaction_id, 'outcome': 'reversed', 'message': f'Transaction {transaction_id} successfully reversed.'})
+
+    if not to_reverse:
+        conn.close()
+        return jsonify({'reversed': 0, 'results': results}), 200
+
+    now = datetime.datetime.now().isoformat()
+    try:
+        new_txn_ids = database.generate_unique_ids('Transactions', 'T', len(to_reverse), conn=conn)
+        cursor.executemany('UPDATE Transactions SET status = ?, description = ? WHERE id = ?',
+                           [('Reversed', (transaction['description'] or '') + ' (Reversed by Admin)', transaction['id'])
+                            for transaction, _ in to_reverse])
+        cursor.executemany('UPDATE Accounts SET balance = balance + ?, updated_at = ? WHERE id = ?',
+                           [(change, now, account_id) for account_id, change in balance_changes.items()])
+        cursor.executemany('''
+            INSERT INTO Transactions (id, account_id, account_number, customer_name, type, amount, transaction_date, status, description)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(new_txn_id, transaction['account_id'], transaction['account_number'], transaction['customer_name'],
+               reversal_type, transaction['amount'], now, 'Completed', f'Reversal of TXN {transaction["id"]}: {transaction["description"]}')
+              for new_txn_id, (transaction, reversal_type) in zip(new_txn_ids, to_reverse)])
+
+        database.add_audit_log('Admin User (U005)', 'Bulk Transactions Reversed',
+                               f'{len(to_reverse)} transaction(s) reversed across {len(balance_changes)} account(s). '
+                               f'Transaction IDs: {", ".join(transaction["id"] for transaction, _ in to_reverse)}', conn=conn)
+        conn.commit()
         conn.close()
-        return jsonify({'message': f'Transaction {transaction_id} successfully reversed. Account {transaction["account_number"]} balance updated to ${new_balance:.2f}.'}), 200
+        return jsonify({'reversed': len(to_reverse), 'results': results}), 200
     except sqlite3.Error as e:
         conn.rollback()
         conn.close()
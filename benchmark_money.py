@@ -0,0 +1,73 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import database
+
+ROW_COUNT = 500000
+TRANSACTION_TYPES = ['Deposit', 'Withdrawal', 'Deposit (Adjustment)', 'Withdrawal (Reversal)']
+
+def build_db(path, column_type, amounts):
+    """Creates a Transactions table with the given money column type and fills it with the sample amounts."""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f'''
+        CREATE TABLE Transactions (
+            id TEXT PRIMARY KEY,
+            type TEXT NOT NULL,
+            amount {column_type} NOT NULL,
+            status TEXT NOT NULL
+        )
+    ''')
+    rng = random.Random(42)
+    conn.executemany('INSERT INTO Transactions (id, type, amount, status) VALUES (?, ?, ?, ?)',
+                     ((f'T{i}', rng.choice(TRANSACTION_TYPES), amount, 'Completed') for i, amount in enumerate(amounts)))
+    conn.commit()
+    conn.execute('VACUUM')
+    return conn
+
+def time_it(func, repeat=5):
+    """Returns the best wall-clock time of several runs, along with the last result."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def real_totals(conn):
+    """The previous dashboard aggregation: two SUM(amount) scans over REAL dollars."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT SUM(amount) FROM Transactions WHERE type LIKE '%Deposit%' AND status = 'Completed'")
+    deposits = cursor.fetchone()[0] or 0.0
+    cursor.execute("SELECT SUM(amount) FROM Transactions WHERE type LIKE '%Withdrawal%' AND status = 'Completed'")
+    withdrawals = cursor.fetchone()[0] or 0.0
+    return {'deposits': deposits, 'withdrawals': withdrawals}
+
+def main():
+    rng = random.Random(7)
+    cents = [rng.randint(1, 500000) for _ in range(ROW_COUNT)]
+    dollars = [c / 100 for c in cents]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        real_path = os.path.join(tmp, 'real.db')
+        cents_path = os.path.join(tmp, 'cents.db')
+        real_conn = build_db(real_path, 'REAL', dollars)
+        cents_conn = build_db(cents_path, 'INTEGER', cents)
+
+        real_time, real_result = time_it(lambda: real_totals(real_conn))
+        cents_time, cents_result = time_it(lambda: database.get_money_totals(cents_conn))
+
+        print(f"Rows: {ROW_COUNT}")
+        print(f"REAL dollars:    {os.path.getsize(real_path):>12,} bytes, aggregate {real_time * 1000:8.1f} ms, "
+              f"deposits={real_result['deposits']!r}")
+        print(f"INTEGER cents:   {os.path.getsize(cents_path):>12,} bytes, aggregate {cents_time * 1000:8.1f} ms, "
+              f"deposits=${database.format_money(cents_result['deposits'])}")
+        real_conn.close()
+        cents_conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,43 @@
 import sqlite3
 import uuid
+import decimal
 import datetime
 import hashlib
 
 DATABASE = 'bank.db'
+SQLITE_MAX_PARAMS = 500 # Stay well under SQLite's bound-parameter limit for IN (...) lists
+MAX_AMOUNT_CENTS = 10 ** 14 # $1 trillion; keeps values and per-chunk SUMs inside SQLite's 64-bit INTEGER
+
+# Table definitions shared by init_db and migrate_money_to_cents
+ACCOUNTS_TABLE_SQL = '''
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            account_number TEXT UNIQUE NOT NULL,
+            customer_name TEXT NOT NULL, -- Denormalized for easier lookup
+            account_type TEXT NOT NULL, -- 'Savings', 'Checking'
+            balance INTEGER NOT NULL, -- Stored in cents
+            status TEXT NOT NULL, -- 'Active', 'Closed'
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES Users(id) ON DELETE CASCADE
+        )
+    '''
+
+TRANSACTIONS_TABLE_SQL = '''
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            id TEXT PRIMARY KEY,
+            account_id TEXT NOT NULL,
+            account_number TEXT NOT NULL, -- Denormalized
+            customer_name TEXT NOT NULL, -- Denormalized
+            type TEXT NOT NULL, -- 'Deposit', 'Withdrawal', 'Transfer', 'Deposit (Adjustment)', 'Withdrawal (Adjustment)', 'Deposit (Reversal)', 'Withdrawal (Reversal)'
+            amount INTEGER NOT NULL, -- Stored in cents
+            transaction_date TEXT NOT NULL,
+            status TEXT NOT NULL, -- 'Completed', 'Pending', 'Failed', 'Reversed'
+            description TEXT,
+            FOREIGN KEY (account_id) REFERENCES Accounts(id) ON DELETE CASCADE
+        )
+    '''
 
 def get_db_connection():
     """Establishes a connection to the SQLite database."""
@@ -31,36 +65,10 @@ def init_db():
     ''')
 
     # Create Accounts table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Accounts (
-            id TEXT PRIMARY KEY,
-            user_id TEXT NOT NULL,
-            account_number TEXT UNIQUE NOT NULL,
-            customer_name TEXT NOT NULL, -- Denormalized for easier lookup
-            account_type TEXT NOT NULL, -- 'Savings', 'Checking'
-            balance REAL NOT NULL,
-            status TEXT NOT NULL, -- 'Active', 'Closed'
-            created_at TEXT NOT NULL,
-            updated_at TEXT NOT NULL,
-            FOREIGN KEY (user_id) REFERENCES Users(id) ON DELETE CASCADE
-        )
-    ''')
+    cursor.execute(ACCOUNTS_TABLE_SQL.format(table_name='Accounts'))
 
     # Create Transactions table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Transactions (
-            id TEXT PRIMARY KEY,
-            account_id TEXT NOT NULL,
-            account_number TEXT NOT NULL, -- Denormalized
-            customer_name TEXT NOT NULL, -- Denormalized
-            type TEXT NOT NULL, -- 'Deposit', 'Withdrawal', 'Transfer', 'Deposit (Adjustment)', 'Withdrawal (Adjustment)', 'Deposit (Reversal)', 'Withdrawal (Reversal)'
-            amount REAL NOT NULL,
-            transaction_date TEXT NOT NULL,
-            status TEXT NOT NULL, -- 'Completed', 'Pending', 'Failed', 'Reversed'
-            description TEXT,
-            FOREIGN KEY (account_id) REFERENCES Accounts(id) ON DELETE CASCADE
-        )
-    ''')
+    cursor.execute(TRANSACTIONS_TABLE_SQL.format(table_name='Transactions'))
 
     # Create AuditLogs table
     cursor.execute('''
@@ -73,6 +81,8 @@ def init_db():
         )
     ''')
 
+    migrate_money_to_cents(conn)
+
     # Check if tables are empty and insert mock data if they are
     cursor.execute("SELECT COUNT(*) FROM Users")
     if cursor.fetchone()[0] == 0:
@@ -105,7 +115,7 @@ def init_db():
             cursor.execute('''
                 INSERT INTO Accounts (id, user_id, account_number, customer_name, account_type, balance, status, created_at, updated_at)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (account['id'], account['user_id'], account['account_number'], account['customer_name'], account['account_type'], account['balance'], account['status'], now, now))
+            ''', (account['id'], account['user_id'], account['account_number'], account['customer_name'], account['account_type'], to_cents(account['balance']), account['status'], now, now))
 
         # Transactions
         transactions_data = [
@@ -121,7 +131,7 @@ def init_db():
             cursor.execute('''
                 INSERT INTO Transactions (id, account_id, account_number, customer_name, type, amount, transaction_date, status, description)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (txn['id'], txn['account_id'], txn['account_number'], txn['customer_name'], txn['type'], txn['amount'], txn['date'], txn['status'], txn['description']))
+            ''', (txn['id'], txn['account_id'], txn['account_number'], txn['customer_name'], txn['type'], to_cents(txn['amount']), txn['date'], txn['status'], txn['description']))
 
         # Audit Logs
         audit_logs_data = [
@@ -138,9 +148,84 @@ def init_db():
         print("Mock data inserted successfully.")
     conn.close()
 
-def add_audit_log(admin_user, action_type, action_details):
-    """Adds an entry to the audit logs table."""
-    conn = get_db_connection()
+def to_cents(amount):
+    """Converts a dollar amount from JSON (int, float or numeric string) to integer cents, rounding half up."""
+    dollars = decimal.Decimal(str(amount))
+    if dollars.is_finite() and abs(dollars) * 100 > MAX_AMOUNT_CENTS:
+        raise ValueError(f'Amount exceeds the maximum of ${format_money(MAX_AMOUNT_CENTS)}')
+    return int(dollars.quantize(decimal.Decimal('0.01'), rounding=decimal.ROUND_HALF_UP) * 100)
+
+def from_cents(cents):
+    """Converts integer cents back to a dollar amount for JSON responses."""
+    return cents / 100 if cents is not None else None
+
+def format_money(cents):
+    """Formats integer cents as a dollar string with two decimals, without going through floats."""
+    sign = '-' if cents < 0 else ''
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+def migrate_money_to_cents(conn):
+    """Rebuilds the Accounts and Transactions tables if they still store money as REAL dollars."""
+    cursor = conn.cursor()
+    money_tables = {'Accounts': ('balance', ACCOUNTS_TABLE_SQL), 'Transactions': ('amount', TRANSACTIONS_TABLE_SQL)}
+    for table_name, (column, table_sql) in money_tables.items():
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        column_type = next(row['type'] for row in cursor.fetchall() if row['name'] == column)
+        if column_type.upper() != 'REAL':
+            continue
+        # Rebuild inside an explicit transaction so a crash never leaves a stray *_cents table behind
+        cursor.execute("BEGIN")
+        try:
+            cursor.execute(f"DROP TABLE IF EXISTS {table_name}_cents")
+            cursor.execute(table_sql.format(table_name=f'{table_name}_cents'))
+            cursor.execute(f"PRAGMA table_info({table_name}_cents)")
+            if next(row['type'] for row in cursor.fetchall() if row['name'] == column).upper() != 'INTEGER':
+                raise sqlite3.DatabaseError(f'Rebuilt {table_name}.{column} is not an INTEGER column')
+            cursor.execute(f"PRAGMA table_info({table_name})")
+            columns = [row['name'] for row in cursor.fetchall()]
+            select_list = ', '.join(f'CAST(ROUND({name} * 100) AS INTEGER)' if name == column else name for name in columns)
+            cursor.execute(f"INSERT INTO {table_name}_cents ({', '.join(columns)}) SELECT {select_list} FROM {table_name}")
+            cursor.execute(f"DROP TABLE {table_name}")
+            cursor.execute(f"ALTER TABLE {table_name}_cents RENAME TO {table_name}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        print(f"Migrated {table_name}.{column} to integer cents.")
+
+def get_money_totals(conn, chunk_size=50000):
+    """Returns exact integer totals (in cents) of completed deposits and withdrawals, read in rowid chunks from one snapshot."""
+    if conn.in_transaction:
+        raise ValueError('get_money_totals needs a connection with no open transaction')
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
+    try:
+        cursor.execute("SELECT MAX(rowid) FROM Transactions")
+        max_rowid = cursor.fetchone()[0] or 0
+        totals = {'deposits': 0, 'withdrawals': 0}
+        for start in range(0, max_rowid, chunk_size):
+            cursor.execute('''
+                SELECT SUM(CASE WHEN type LIKE '%Deposit%' THEN amount ELSE 0 END),
+                       SUM(CASE WHEN type LIKE '%Withdrawal%' THEN amount ELSE 0 END)
+                FROM Transactions
+                WHERE rowid > ? AND rowid <= ? AND status = 'Completed'
+            ''', (start, start + chunk_size))
+            deposits, withdrawals = cursor.fetchone()
+            totals['deposits'] += deposits or 0
+            totals['withdrawals'] += withdrawals or 0
+        return totals
+    finally:
+        conn.rollback() # Ends the read transaction; nothing was written
+
+def add_audit_log(admin_user, action_type, action_details, conn=None):
+    """Adds an entry to the audit logs table.
+
+    If a connection is passed in, the entry is written on it and left for the
+    caller to commit, so it becomes part of the caller's transaction.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
     cursor = conn.cursor()
     log_id = str(uuid.uuid4()) # Generate a unique ID for the log
     timestamp = datetime.datetime.now().isoformat()
@@ -148,8 +233,9 @@ def add_audit_log(admin_user, action_type, action_details):
         INSERT INTO AuditLogs (id, timestamp, admin_user, action_type, action_details)
         VALUES (?, ?, ?, ?, ?)
     ''', (log_id, timestamp, admin_user, action_type, action_details))
-    conn.commit()
-    conn.close()
+    if own_conn:
+        conn.commit()
+        conn.close()
 
 def generate_unique_account_number():
     """Generates a unique 9-digit account number."""
@@ -174,6 +260,30 @@ def generate_unique_id(table_name, prefix):
             conn.close()
             return new_id
 
+def generate_unique_ids(table_name, prefix, count, conn=None):
+    """Generates `count` unique IDs for a given table with a prefix, checking collisions in batches."""
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
+    cursor = conn.cursor()
+    new_ids = set()
+    while len(new_ids) < count:
+        candidates = {f"{prefix}{str(uuid.uuid4())[:7].replace('-', '')}" for _ in range(count - len(new_ids))}
+        candidates -= new_ids
+        for chunk in chunked(list(candidates)):
+            placeholders = ', '.join('?' * len(chunk))
+            cursor.execute(f"SELECT id FROM {table_name} WHERE id IN ({placeholders})", chunk)
+            candidates -= {row[0] for row in cursor.fetchall()}
+        new_ids |= candidates
+    if own_conn:
+        conn.close()
+    return list(new_ids)
+
+def chunked(items, size=SQLITE_MAX_PARAMS):
+    """Splits a list into slices small enough to bind as SQLite query parameters."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
 if __name__ == '__main__':
     # This block runs when database.py is executed directly
     init_db()